@@ -1,10 +1,12 @@
 
 # core/admin.py
 from django.contrib import admin
-from .models import Cliente, Mesa, Reserva
+from .models import Cliente, Mesa, Reserva, RegistroAuditoria, ReservaArquivada
 
 admin.site.register(Cliente)
 admin.site.register(Mesa)
 admin.site.register(Reserva)
+admin.site.register(RegistroAuditoria)
+admin.site.register(ReservaArquivada)
 
 
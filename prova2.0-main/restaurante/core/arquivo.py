@@ -0,0 +1,44 @@
+import datetime
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import Reserva, ReservaArquivada
+
+CAMPOS_COPIADOS = ['cliente_id', 'mesa_id', 'data_reserva', 'hora_entrada', 'hora_saida', 'num_pessoas']
+CAMPOS_RELATORIO = ['mesa_id', 'data_reserva', 'hora_entrada', 'hora_saida', 'num_pessoas']
+
+
+def arquivar_reservas(dias, tamanho_lote=1000):
+    # Move para ReservaArquivada as reservas com data anterior a (hoje - dias). Retorna quantas foram movidas.
+    limite = datetime.date.today() - datetime.timedelta(days=dias)
+    total = 0
+    while True:
+        with transaction.atomic():  # Cada lote é copiado e apagado junto: ou vai tudo, ou nada.
+            lote = list(
+                Reserva.objects.filter(data_reserva__lt=limite)
+                .order_by('data_reserva', 'hora_entrada')
+                .values('id', *CAMPOS_COPIADOS)[:tamanho_lote]
+            )
+            if not lote:
+                return total
+            ids = [linha.pop('id') for linha in lote]
+            ReservaArquivada.objects.bulk_create(
+                [ReservaArquivada(reserva_id=reserva_id, **linha) for reserva_id, linha in zip(ids, lote)]
+            )
+            Reserva.objects.filter(id__in=ids).delete()
+        total += len(ids)
+
+
+def reservas_com_historico(inicio=None, fim=None):
+    # Reservas ativas e arquivadas no período (datas inclusivas), unidas e ordenadas no próprio banco.
+    consultas = []
+    for modelo in (Reserva, ReservaArquivada):
+        reservas = modelo.objects.all()
+        if inicio:
+            reservas = reservas.filter(data_reserva__gte=inicio)
+        if fim:
+            reservas = reservas.filter(data_reserva__lte=fim)
+        consultas.append(reservas.values(*CAMPOS_RELATORIO, cliente_nome=F('cliente__nome')))
+    ativas, arquivadas = consultas
+    return ativas.union(arquivadas, all=True).order_by('data_reserva', 'hora_entrada')
@@ -0,0 +1,147 @@
+import atexit  # Para gravar o que restar no buffer quando o processo terminar.
+import json  # Para converter os valores dos campos em tipos aceitos pelo JSONField.
+import logging
+import threading  # Buffer compartilhado entre requisições e thread de gravação em segundo plano.
+
+from django.core.serializers.json import DjangoJSONEncoder  # Sabe serializar date, time, Decimal etc.
+from django.contrib.auth.models import User
+from django.db import connection, router, transaction
+from django.db.models.deletion import Collector  # Descobre o que será apagado em cascata.
+from django.utils import timezone
+
+from .models import Cliente, Mesa, RegistroAuditoria, Reserva
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 100  # Quantidade de registros que dispara uma gravação imediata.
+INTERVALO_GRAVACAO = 5  # Segundos máximos que um registro fica só na memória.
+CAMPOS_IGNORADOS = {'password', 'last_login'}  # Campos que não devem aparecer no log.
+MODELOS_AUDITADOS = {Cliente, Mesa, Reserva, User}
+
+ATIVO = True  # Permite desligar a auditoria (usado pelo comando benchmark_auditoria).
+
+_buffer = []
+_lock = threading.Lock()
+_evento = threading.Event()
+_thread = None
+
+
+def capturar(objeto):
+    # Retorna um dicionário com os valores atuais dos campos do objeto (usado como "antes").
+    valores = {
+        campo.attname: campo.value_from_object(objeto)
+        for campo in objeto._meta.concrete_fields
+        if campo.name not in CAMPOS_IGNORADOS
+    }
+    return json.loads(json.dumps(valores, cls=DjangoJSONEncoder))
+
+
+def diferencas(antes, depois):
+    # Retorna só os campos que mudaram, no formato {'campo': [antes, depois]}.
+    campos = antes.keys() | depois.keys()
+    return {
+        campo: [antes.get(campo), depois.get(campo)]
+        for campo in sorted(campos)
+        if antes.get(campo) != depois.get(campo)
+    }
+
+
+def registrar(acao, objeto, usuario, antes=None):
+    # Coloca a alteração no buffer; a gravação no banco acontece depois, em lote.
+    if not ATIVO:
+        return
+    antes = antes or {}
+    depois = capturar(objeto) if acao != 'deletar' else {}
+    registro = RegistroAuditoria(
+        acao=acao,
+        modelo=objeto._meta.model_name,
+        objeto_id=objeto.pk or antes.get('id'),  # Após delete() o pk do objeto vira None.
+        usuario_id=usuario.pk,  # Só o ID: o objeto pode ser deletado antes da gravação.
+        usuario_nome=usuario.get_username() if usuario.is_authenticated else '',
+        data_hora=timezone.now(),
+        alteracoes=diferencas(antes, depois),
+    )
+    with _lock:
+        _buffer.append(registro)
+        cheio = len(_buffer) >= TAMANHO_LOTE
+    _iniciar_thread()
+    if cheio:
+        _evento.set()  # Acorda a thread de gravação sem esperar o intervalo.
+
+
+def deletar(objeto, usuario):
+    # Deleta o objeto e registra a deleção dele e de tudo que for apagado em cascata (ex.: reservas de um cliente).
+    banco = router.db_for_write(type(objeto))
+    with transaction.atomic(using=banco):  # Nada criado entre a coleta e a deleção escapa do log.
+        coletor = Collector(using=banco)
+        coletor.collect([objeto])
+        apagados = [item for itens in coletor.data.values() for item in itens]
+        apagados += [item for queryset in coletor.fast_deletes for item in queryset]
+        apagados = [(item, capturar(item)) for item in apagados if type(item) in MODELOS_AUDITADOS]
+        coletor.delete()  # Usa a mesma coleta, sem percorrer a cascata de novo.
+    for item, antes in apagados:
+        registrar('deletar', item, usuario, antes)
+
+
+def descarregar():
+    # Grava no banco tudo o que está no buffer. Retorna quantos registros foram gravados.
+    global _buffer
+    with _lock:
+        lote, _buffer = _buffer, []
+    if not lote:
+        return 0
+    try:
+        RegistroAuditoria.objects.bulk_create(lote)
+    except Exception:
+        # Ex.: "database is locked" no SQLite. Devolve o lote ao início do buffer para tentar de novo.
+        with _lock:
+            _buffer[:0] = lote
+        raise
+    return len(lote)
+
+
+def _gravar_em_segundo_plano():
+    while True:
+        _evento.wait(INTERVALO_GRAVACAO)
+        _evento.clear()
+        try:
+            descarregar()
+        except Exception:
+            logger.exception('Falha ao gravar o log de auditoria; nova tentativa em %s s.', INTERVALO_GRAVACAO)
+        finally:
+            connection.close()  # A thread não passa pelo ciclo de requisição, então fecha a conexão aqui.
+
+
+def _iniciar_thread():
+    # Inicia a thread de gravação, ou uma nova se a anterior tiver morrido.
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    with _lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_gravar_em_segundo_plano, name='auditoria', daemon=True)
+            _thread.start()
+
+
+atexit.register(descarregar)
+
+
+# Consultas (descarregam o buffer antes para incluir as alterações mais recentes)
+
+def historico_objeto(objeto):
+    descarregar()
+    return RegistroAuditoria.objects.filter(modelo=objeto._meta.model_name, objeto_id=objeto.pk)
+
+
+def historico_usuario(usuario, inicio=None, fim=None):
+    return historico_periodo(inicio, fim).filter(usuario=usuario)
+
+
+def historico_periodo(inicio=None, fim=None):
+    descarregar()
+    registros = RegistroAuditoria.objects.all()
+    if inicio:
+        registros = registros.filter(data_hora__gte=inicio)
+    if fim:
+        registros = registros.filter(data_hora__lt=fim)
+    return registros
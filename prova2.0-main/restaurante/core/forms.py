@@ -3,6 +3,7 @@ from .models import Cliente, Reserva  # Importa os modelos Cliente e Reserva do
 from django.contrib.auth.forms import UserCreationForm  # Importa o formulário de criação de usuários do Django.
 from django.contrib.auth.models import User  # Importa o modelo de usuário do Django.
 from .models import Mesa  # Importa o modelo Mesa do módulo atual.
+from .replicas import PRIMARIO  # Alias do banco primário (onde as reservas são gravadas).
 
 # Formulário para o modelo Cliente
 class ClienteForm(forms.ModelForm):
@@ -59,7 +60,8 @@ class ReservaForm(forms.ModelForm):
 
 
         # Verifica se já existe uma reserva para a mesma mesa, data e horário
-        reservas_existentes = Reserva.objects.filter(
+        # A consulta vai sempre ao primário: uma réplica atrasada deixaria passar conflitos.
+        reservas_existentes = Reserva.objects.using(PRIMARIO).filter(
             mesa=mesa,
             data_reserva=data_reserva,
             hora_entrada__lt=hora_saida,  # Verifica se a hora de entrada da nova reserva é antes da hora de saída da reserva existente.
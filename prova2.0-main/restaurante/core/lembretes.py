@@ -0,0 +1,135 @@
+import logging
+import threading  # Uma conexão SMTP por thread de envio.
+from concurrent.futures import ThreadPoolExecutor  # Envia os lotes em paralelo, fora do processo web.
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Exists, OuterRef, Q
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import LembreteEnviado, Reserva
+
+logger = logging.getLogger(__name__)
+
+ASSUNTOS = {
+    'confirmacao': 'Reserva confirmada - Restaurante Maydes',
+    'lembrete': 'Lembrete da sua reserva - Restaurante Maydes',
+}
+
+
+def reservas_a_partir_de(inicio, fim=None):
+    # Reservas com entrada entre inicio e fim (sem fim = todas as futuras). Usa o índice (data_reserva, hora_entrada).
+    inicio = timezone.localtime(inicio)
+    filtro = Q(data_reserva=inicio.date(), hora_entrada__gte=inicio.time()) | Q(data_reserva__gt=inicio.date())
+    if fim is not None:
+        fim = timezone.localtime(fim)
+        filtro &= Q(data_reserva__lt=fim.date()) | Q(data_reserva=fim.date(), hora_entrada__lt=fim.time())
+    return Reserva.objects.filter(filtro)
+
+
+def pendentes(tipo, janela):
+    # Reservas que ainda não receberam o e-mail do tipo informado.
+    agora = timezone.now()
+    if tipo == 'lembrete':
+        reservas = reservas_a_partir_de(agora, agora + janela)  # Só as que acontecem dentro da janela.
+    else:
+        reservas = reservas_a_partir_de(agora)  # Confirmação: qualquer reserva futura.
+    ja_enviados = LembreteEnviado.objects.filter(reserva=OuterRef('pk'), tipo=tipo)
+    return (
+        reservas.filter(~Exists(ja_enviados))
+        .select_related('cliente', 'mesa')
+        .order_by('data_reserva', 'hora_entrada')
+    )
+
+
+class Despachante:
+    """
+    Envia os e-mails em lotes por um pool de conexões SMTP reaproveitadas.
+    Cada mensagem já montada é marcada em LembreteEnviado antes do envio,
+    então reiniciar o processo não manda o mesmo e-mail duas vezes (se o
+    processo cair no meio do envio, as marcas sem enviado_em ficam como
+    estão: é preferível não enviar a enviar em dobro). Rode só um
+    despachante por vez.
+    """
+
+    def __init__(self, tamanho_lote=200, conexoes=4):
+        self.tamanho_lote = tamanho_lote
+        self.conexoes = conexoes
+        self._local = threading.local()
+        self._abertas = []
+        self._lock = threading.Lock()
+
+    def enviar(self, tipo, janela):
+        # Envia todos os e-mails pendentes do tipo. Retorna quantos foram enviados.
+        template = get_template(f'core/emails/{tipo}.txt')
+        futuros = []
+        ignoradas = []  # Reservas cuja mensagem não pôde ser montada; ficam para a próxima execução.
+        with ThreadPoolExecutor(max_workers=self.conexoes) as executor:
+            while True:
+                lote = list(pendentes(tipo, janela).exclude(pk__in=ignoradas)[:self.tamanho_lote])
+                if not lote:
+                    break
+                # Monta as mensagens antes de marcar: um erro aqui não pode deixar marcas sem envio.
+                mensagens = []
+                for reserva in lote:
+                    try:
+                        mensagens.append((reserva.pk, self._montar(template, tipo, reserva)))
+                    except Exception:
+                        logger.exception('Não foi possível montar o e-mail de %s da reserva #%s.', tipo, reserva.pk)
+                        ignoradas.append(reserva.pk)
+                if not mensagens:
+                    continue
+                LembreteEnviado.objects.bulk_create(
+                    [LembreteEnviado(reserva_id=reserva_id, tipo=tipo) for reserva_id, _ in mensagens]
+                )
+                futuros.append(executor.submit(self._enviar_lote, mensagens))
+        self._fechar_conexoes()
+
+        enviados, falhas = [], []
+        for futuro in futuros:
+            ok, erro = futuro.result()
+            enviados += ok
+            falhas += erro
+        LembreteEnviado.objects.filter(reserva_id__in=enviados, tipo=tipo).update(enviado_em=timezone.now())
+        # Os que falharam voltam a ficar pendentes para a próxima execução.
+        LembreteEnviado.objects.filter(reserva_id__in=falhas, tipo=tipo).delete()
+        return len(enviados)
+
+    def _montar(self, template, tipo, reserva):
+        return EmailMessage(
+            subject=ASSUNTOS[tipo],
+            body=template.render({'reserva': reserva}),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[reserva.cliente.email],
+        )
+
+    def _enviar_lote(self, mensagens):
+        # Roda nas threads do pool; não acessa o banco, só o SMTP.
+        try:
+            conexao = self._conexao()
+        except Exception:
+            return [], [reserva_id for reserva_id, _ in mensagens]  # Servidor fora do ar: nada foi enviado.
+        ok, erro = [], []
+        for reserva_id, mensagem in mensagens:
+            try:
+                conexao.send_messages([mensagem])
+                ok.append(reserva_id)
+            except Exception:
+                erro.append(reserva_id)
+        return ok, erro
+
+    def _conexao(self):
+        if getattr(self._local, 'conexao', None) is None:
+            conexao = get_connection()
+            conexao.open()
+            with self._lock:
+                self._abertas.append(conexao)
+            self._local.conexao = conexao
+        return self._local.conexao
+
+    def _fechar_conexoes(self):
+        with self._lock:
+            for conexao in self._abertas:
+                conexao.close()
+            self._abertas = []
@@ -0,0 +1,118 @@
+import math  # Para arredondar o Retry-After para cima.
+import threading  # Lock do armazenamento local e semáforos de concorrência.
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+# Limites padrão por classe de endpoint: (fichas repostas por segundo, tamanho máximo da rajada)
+LIMITES_PADRAO = {
+    'reservas': (1, 10),
+    'relatorios': (0.2, 3),
+}
+
+# Quantos relatórios (PDF) podem ser gerados ao mesmo tempo em cada processo
+CONCORRENCIA_PADRAO = {
+    'relatorios': 2,
+}
+
+
+# Armazena os baldes na memória do processo (padrão)
+class ArmazenamentoLocal:
+    def __init__(self):
+        self._baldes = {}
+        self._lock = threading.Lock()
+
+    def consumir(self, chave, taxa, capacidade):
+        with self._lock:
+            fichas, ultimo = self._baldes.get(chave, (capacidade, time.monotonic()))
+            fichas, ultimo, espera = _consumir(fichas, ultimo, taxa, capacidade)
+            self._baldes[chave] = (fichas, ultimo)
+        return espera
+
+
+# Armazena os baldes em um cache do Django, compartilhado entre processos/servidores
+class ArmazenamentoCache:
+    def __init__(self, alias):
+        self._cache = caches[alias]
+
+    def consumir(self, chave, taxa, capacidade):
+        # Leitura e escrita não são atômicas entre processos: o limite é aproximado, o que basta aqui.
+        chave = f'limite:{chave}'
+        fichas, ultimo = self._cache.get(chave, (capacidade, time.time()))
+        fichas, ultimo, espera = _consumir(fichas, ultimo, taxa, capacidade, agora=time.time())
+        self._cache.set(chave, (fichas, ultimo), timeout=math.ceil(capacidade / taxa) + 1)
+        return espera
+
+
+def _consumir(fichas, ultimo, taxa, capacidade, agora=None):
+    # Repõe as fichas pelo tempo passado e tenta gastar uma. Retorna (fichas, agora, segundos de espera).
+    agora = time.monotonic() if agora is None else agora
+    fichas = min(capacidade, fichas + (agora - ultimo) * taxa)
+    if fichas >= 1:
+        return fichas - 1, agora, 0
+    return fichas, agora, (1 - fichas) / taxa
+
+
+_armazenamento = None
+_semaforos = {}
+_semaforos_lock = threading.Lock()
+
+
+def _obter_armazenamento():
+    global _armazenamento
+    if _armazenamento is None:
+        alias = getattr(settings, 'LIMITES_CACHE', None)  # Ex.: 'default' para usar o cache compartilhado.
+        _armazenamento = ArmazenamentoCache(alias) if alias else ArmazenamentoLocal()
+    return _armazenamento
+
+
+def _obter_semaforo(classe):
+    with _semaforos_lock:
+        if classe not in _semaforos:
+            limites = {**CONCORRENCIA_PADRAO, **getattr(settings, 'LIMITES_CONCORRENCIA', {})}
+            _semaforos[classe] = threading.BoundedSemaphore(limites[classe])
+        return _semaforos[classe]
+
+
+def muitas_requisicoes(espera):
+    # Resposta rápida 429 informando em quantos segundos tentar de novo.
+    response = HttpResponse('Muitas requisições. Tente novamente em instantes.', status=429)
+    response['Retry-After'] = str(max(1, math.ceil(espera)))
+    return response
+
+
+def limitar(classe):
+    # Decorador: limita as requisições por usuário (ou IP, se anônimo) para a classe de endpoint.
+    def decorador(view):
+        @wraps(view)
+        def _view(request, *args, **kwargs):
+            taxa, capacidade = {**LIMITES_PADRAO, **getattr(settings, 'LIMITES_TAXA', {})}[classe]
+            if request.user.is_authenticated:
+                identificador = f'usuario:{request.user.pk}'
+            else:
+                identificador = f'ip:{request.META.get("REMOTE_ADDR")}'
+            espera = _obter_armazenamento().consumir(f'{classe}:{identificador}', taxa, capacidade)
+            if espera:
+                return muitas_requisicoes(espera)
+            return view(request, *args, **kwargs)
+        return _view
+    return decorador
+
+
+def limitar_concorrencia(classe):
+    # Decorador: recusa na hora (sem esperar) quando já há muitas execuções da classe em andamento.
+    def decorador(view):
+        @wraps(view)
+        def _view(request, *args, **kwargs):
+            semaforo = _obter_semaforo(classe)
+            if not semaforo.acquire(blocking=False):
+                return muitas_requisicoes(1)
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                semaforo.release()
+        return _view
+    return decorador
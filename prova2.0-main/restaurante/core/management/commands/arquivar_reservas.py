@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.arquivo import arquivar_reservas
+
+
+class Command(BaseCommand):
+    help = 'Move as reservas mais antigas que a janela de retenção para a tabela de reservas arquivadas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=90, help='Reservas com data anterior a hoje menos DIAS são arquivadas.')
+        parser.add_argument('--lote', type=int, default=1000, help='Quantidade de reservas movidas por transação.')
+
+    def handle(self, *args, **options):
+        # Com menos de 1 dia seriam arquivadas reservas de hoje ou futuras, que o ReservaForm.clean precisa ver.
+        if options['dias'] < 1:
+            raise CommandError('--dias precisa ser pelo menos 1.')
+        if options['lote'] < 1:
+            raise CommandError('--lote precisa ser pelo menos 1.')
+        total = arquivar_reservas(options['dias'], options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'{total} reservas arquivadas.'))
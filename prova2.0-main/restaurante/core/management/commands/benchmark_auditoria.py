@@ -0,0 +1,68 @@
+import datetime
+import inspect  # Para chegar na view sem os decoradores.
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from core import auditoria
+from core.models import Cliente, Mesa, RegistroAuditoria
+from core.views import criar_reserva
+
+# View sem @login_required/@limitar: o limite de requisições devolveria 429 depois de poucas reservas.
+criar_reserva_sem_limite = inspect.unwrap(criar_reserva)
+
+
+class Command(BaseCommand):
+    help = 'Mede o tempo da view criar_reserva com e sem auditoria (os dados de teste são apagados no final).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requisicoes', type=int, default=500, help='Reservas criadas em cada rodada.')
+
+    def handle(self, *args, **options):
+        n = options['requisicoes']
+        usuario, _ = User.objects.get_or_create(username='benchmark_auditoria')
+        try:
+            sem = self.rodada(n, usuario, ativo=False)
+            com = self.rodada(n, usuario, ativo=True)
+        finally:
+            # A gravação do log acontece em outra thread, então os dados são apagados em vez de usar rollback.
+            auditoria.descarregar()
+            Cliente.objects.filter(email__startswith='benchmark_auditoria').delete()  # Apaga as reservas junto (CASCADE).
+            Mesa.objects.filter(numero__in=[-1, -2]).delete()
+            RegistroAuditoria.objects.filter(usuario=usuario).delete()
+            usuario.delete()
+
+        self.stdout.write(f'Sem auditoria: {sem * 1000:.3f} ms por requisição')
+        self.stdout.write(f'Com auditoria: {com * 1000:.3f} ms por requisição')
+        self.stdout.write(f'Custo extra:   {(com - sem) / sem * 100:+.1f}%')
+
+    def rodada(self, n, usuario, ativo):
+        # Cada rodada usa cliente e mesa próprios (número negativo, que nenhuma mesa real usa).
+        cliente = Cliente.objects.create(nome='Benchmark', email=f'benchmark_auditoria_{ativo}@exemplo.com', telefone='0')
+        mesa = Mesa.objects.create(numero=-1 - int(ativo), capacidade=4)
+        primeiro_dia = datetime.date.today() + datetime.timedelta(days=1)
+        fabrica = RequestFactory()
+
+        auditoria.ATIVO = ativo
+        try:
+            tempo = 0.0
+            for i in range(n):
+                request = fabrica.post('/reservas/criar/', {
+                    'cliente': cliente.pk,
+                    'mesa': mesa.pk,
+                    'data_reserva': primeiro_dia + datetime.timedelta(days=i),  # Um dia por reserva, sem conflito.
+                    'hora_entrada': '19:00',
+                    'hora_saida': '21:00',
+                    'num_pessoas': 2,
+                })
+                request.user = usuario
+                comeco = time.perf_counter()
+                response = criar_reserva_sem_limite(request)
+                tempo += time.perf_counter() - comeco
+                if response.status_code != 302:  # Sem redirecionamento a reserva não foi criada e a medida não vale.
+                    raise CommandError(f'criar_reserva respondeu {response.status_code} em vez de criar a reserva.')
+        finally:
+            auditoria.ATIVO = True
+        return tempo / n
@@ -0,0 +1,30 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.lembretes import Despachante
+
+
+class Command(BaseCommand):
+    help = (
+        'Envia os e-mails de confirmação e de lembrete das reservas. Com --intervalo, '
+        'fica rodando como worker. Para testar localmente: python -m aiosmtpd -n -l localhost:1025'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--janela-horas', type=int, default=24, help='Envia lembrete para reservas que começam nas próximas N horas.')
+        parser.add_argument('--lote', type=int, default=200, help='E-mails por lote.')
+        parser.add_argument('--conexoes', type=int, default=4, help='Conexões SMTP usadas em paralelo.')
+        parser.add_argument('--intervalo', type=int, default=0, help='Segundos entre execuções (0 = executa uma vez e sai).')
+
+    def handle(self, *args, **options):
+        janela = datetime.timedelta(hours=options['janela_horas'])
+        despachante = Despachante(options['lote'], options['conexoes'])
+        while True:
+            for tipo in ('confirmacao', 'lembrete'):
+                total = despachante.enviar(tipo, janela)
+                self.stdout.write(f'{total} e-mails de {tipo} enviados.')
+            if not options['intervalo']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_rename_hora_reserva_reserva_hora_entrada_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroAuditoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('acao', models.CharField(choices=[('criar', 'Criar'), ('editar', 'Editar'), ('deletar', 'Deletar')], max_length=10)),
+                ('modelo', models.CharField(max_length=50)),
+                ('objeto_id', models.BigIntegerField()),
+                ('data_hora', models.DateTimeField()),
+                ('alteracoes', models.JSONField(default=dict)),
+                ('usuario', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-data_hora'],
+                'indexes': [models.Index(fields=['modelo', 'objeto_id', 'data_hora'], name='core_regist_modelo_077b3f_idx'), models.Index(fields=['usuario', 'data_hora'], name='core_regist_usuario_e7ac11_idx'), models.Index(fields=['data_hora'], name='core_regist_data_ho_7ae5be_idx')],
+            },
+        ),
+    ]
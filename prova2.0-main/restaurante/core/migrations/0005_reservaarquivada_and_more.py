@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_registroauditoria'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservaArquivada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reserva_id', models.BigIntegerField(unique=True)),
+                ('data_reserva', models.DateField()),
+                ('hora_entrada', models.TimeField()),
+                ('hora_saida', models.TimeField()),
+                ('num_pessoas', models.IntegerField()),
+                ('arquivada_em', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['data_reserva', 'hora_entrada'], name='core_reserv_data_re_4465f1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['mesa', 'data_reserva'], name='core_reserv_mesa_id_6f1039_idx'),
+        ),
+        migrations.AddField(
+            model_name='reservaarquivada',
+            name='cliente',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.cliente'),
+        ),
+        migrations.AddField(
+            model_name='reservaarquivada',
+            name='mesa',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.mesa'),
+        ),
+        migrations.AddIndex(
+            model_name='reservaarquivada',
+            index=models.Index(fields=['data_reserva', 'hora_entrada'], name='core_reserv_data_re_801236_idx'),
+        ),
+    ]
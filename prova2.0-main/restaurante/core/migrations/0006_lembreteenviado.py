@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_reservaarquivada_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LembreteEnviado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('confirmacao', 'Confirmação'), ('lembrete', 'Lembrete')], max_length=20)),
+                ('enviado_em', models.DateTimeField(null=True)),
+                ('reserva', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lembretes', to='core.reserva')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('reserva', 'tipo'), name='lembrete_unico_por_reserva')],
+            },
+        ),
+    ]
@@ -28,7 +28,81 @@ class Reserva(models.Model):
     hora_saida = models.TimeField()     # Horário de saída
     num_pessoas = models.IntegerField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['data_reserva', 'hora_entrada']),  # Listagens por data e seleção para o arquivamento
+            models.Index(fields=['mesa', 'data_reserva']),  # Verificação de conflito no ReservaForm.clean
+        ]
+
     def __str__(self):
         return f'Reserva de {self.cliente.nome} na {self.mesa} para {self.num_pessoas} pessoas'
 
+
+class LembreteEnviado(models.Model):
+    # Controle de idempotência dos e-mails: no máximo um envio de cada tipo por reserva.
+    TIPOS = [
+        ('confirmacao', 'Confirmação'),
+        ('lembrete', 'Lembrete'),
+    ]
+
+    reserva = models.ForeignKey(Reserva, on_delete=models.CASCADE, related_name='lembretes')
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    enviado_em = models.DateTimeField(null=True)  # Fica vazio enquanto o envio está em andamento (ou se falhou no meio)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['reserva', 'tipo'], name='lembrete_unico_por_reserva'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_tipo_display()} da reserva #{self.reserva_id}'
+
+
+class ReservaArquivada(models.Model):
+    # Reservas antigas movidas pelo comando arquivar_reservas, para manter a tabela Reserva pequena.
+    reserva_id = models.BigIntegerField(unique=True)  # ID que a reserva tinha na tabela Reserva
+    cliente = models.ForeignKey(Cliente, null=True, on_delete=models.SET_NULL)  # Mantém o histórico mesmo se o cliente for deletado
+    mesa = models.ForeignKey(Mesa, null=True, on_delete=models.SET_NULL)
+    data_reserva = models.DateField()
+    hora_entrada = models.TimeField()
+    hora_saida = models.TimeField()
+    num_pessoas = models.IntegerField()
+    arquivada_em = models.DateTimeField(auto_now_add=True)  # Quando a reserva foi arquivada
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['data_reserva', 'hora_entrada']),  # Consultas de histórico por período
+        ]
+
+    def __str__(self):
+        return f'Reserva arquivada #{self.reserva_id} de {self.data_reserva}'
+
+
+class RegistroAuditoria(models.Model):
+    ACOES = [
+        ('criar', 'Criar'),
+        ('editar', 'Editar'),
+        ('deletar', 'Deletar'),
+    ]
+
+    acao = models.CharField(max_length=10, choices=ACOES)  # Tipo de alteração feita no objeto
+    modelo = models.CharField(max_length=50)  # Nome do modelo alterado (ex.: 'reserva')
+    objeto_id = models.BigIntegerField()  # ID do objeto alterado (sem FK, para sobreviver à deleção)
+    # Quem fez a alteração. Sem constraint e com DO_NOTHING: deletar o usuário não altera o log.
+    usuario = models.ForeignKey(User, null=True, on_delete=models.DO_NOTHING, db_constraint=False)
+    usuario_nome = models.CharField(max_length=150, blank=True)  # Username no momento da alteração
+    data_hora = models.DateTimeField()  # Momento da alteração (definido na view, não no flush)
+    alteracoes = models.JSONField(default=dict)  # Campos alterados: {'campo': [antes, depois]}
+
+    class Meta:
+        ordering = ['-data_hora']
+        indexes = [
+            models.Index(fields=['modelo', 'objeto_id', 'data_hora']),  # Histórico de um objeto
+            models.Index(fields=['usuario', 'data_hora']),  # Alterações de um usuário
+            models.Index(fields=['data_hora']),  # Consultas por período
+        ]
+
+    def __str__(self):
+        return f'{self.get_acao_display()} {self.modelo} #{self.objeto_id} em {self.data_hora}'
+
     
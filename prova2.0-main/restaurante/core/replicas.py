@@ -0,0 +1,80 @@
+import random  # Para espalhar as leituras entre as réplicas.
+import time
+from contextvars import ContextVar  # Funciona tanto no WSGI (threads) quanto no ASGI.
+from functools import wraps
+
+from django.conf import settings
+
+PRIMARIO = 'default'
+CHAVE_SESSAO = 'usar_primario_ate'  # Até quando (timestamp) as leituras do usuário vão para o primário.
+
+_replica = ContextVar('replica', default=None)  # Réplica escolhida para a requisição atual (None = primário).
+_houve_escrita = ContextVar('houve_escrita', default=False)
+_grudado_no_primario = ContextVar('grudado_no_primario', default=False)
+
+
+# Roteador de banco (settings.DATABASE_ROUTERS)
+class RoteadorReplicas:
+    """
+    Só manda leituras para as réplicas dentro das views marcadas com
+    ``@ler_da_replica``; todo o resto (escritas, formulários, validação de
+    conflito) continua no primário.
+    """
+
+    def db_for_read(self, model, **hints):
+        instancia = hints.get('instance')
+        if instancia is not None and instancia._state.db:
+            # Objetos relacionados (ex.: reserva.cliente) vêm do mesmo banco que o objeto de origem.
+            return instancia._state.db
+        return _replica.get() or PRIMARIO
+
+    def db_for_write(self, model, **hints):
+        _houve_escrita.set(True)
+        return PRIMARIO
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Primário e réplicas têm os mesmos dados.
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARIO  # As réplicas recebem o schema pela replicação.
+
+
+def ler_da_replica(view):
+    # Decorador para views só de leitura (listas e relatórios).
+    @wraps(view)
+    def _view(request, *args, **kwargs):
+        replicas = getattr(settings, 'REPLICAS', [])
+        replica = None
+        if replicas and not _grudado_no_primario.get():
+            replica = random.choice(replicas)  # Uma só réplica por requisição, para a página ficar consistente.
+        token = _replica.set(replica)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica.reset(token)
+    return _view
+
+
+class ReplicaMiddleware:
+    """
+    Leitura das próprias escritas: depois que o usuário grava algo (ex.: cria
+    uma reserva), as leituras dele ficam no primário por REPLICA_ATRASO_MAXIMO
+    segundos, tempo suficiente para a réplica alcançar.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        grudado = request.session.get(CHAVE_SESSAO, 0) > time.time()
+        token_grudado = _grudado_no_primario.set(grudado)
+        token_escrita = _houve_escrita.set(False)
+        try:
+            response = self.get_response(request)
+            if _houve_escrita.get():
+                atraso = getattr(settings, 'REPLICA_ATRASO_MAXIMO', 5)
+                request.session[CHAVE_SESSAO] = time.time() + atraso
+        finally:
+            _grudado_no_primario.reset(token_grudado)
+            _houve_escrita.reset(token_escrita)
+        return response
@@ -0,0 +1,75 @@
+import os  # Para separar o nome e a extensão dos arquivos.
+from io import BytesIO  # Buffer em memória para salvar as imagens processadas.
+
+from django.core.files.base import ContentFile  # Envolve os bytes gerados para gravar no storage.
+from PIL import Image  # Pillow, usado para recomprimir e redimensionar as imagens.
+from whitenoise.storage import CompressedManifestStaticFilesStorage  # Nomes com hash + gzip/brotli.
+
+# Larguras (em pixels) das variantes responsivas geradas para cada imagem.
+LARGURAS_RESPONSIVAS = (480, 960)
+
+# Extensões de imagem que passam pela recompressão.
+EXTENSOES_IMAGEM = ('.png', '.jpg', '.jpeg')
+
+
+def nome_variante(caminho, largura):
+    # Monta o nome da variante, ex.: img/planta.png -> img/planta-480w.webp
+    base, _ = os.path.splitext(caminho)
+    return f'{base}-{largura}w.webp'
+
+
+# Storage de arquivos estáticos usado em produção pelo collectstatic
+class PipelineStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    Antes de gerar os nomes com hash, recomprime as imagens a partir dos
+    arquivos fonte e cria variantes WebP menores para uso em ``srcset``. O
+    WhiteNoise depois pré-comprime tudo em gzip (e brotli, se o pacote
+    ``brotli`` estiver instalado).
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for caminho in list(paths):
+                if caminho.lower().endswith(EXTENSOES_IMAGEM):
+                    paths.update(self.otimizar_imagem(caminho, *paths[caminho]))
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def otimizar_imagem(self, caminho, origem, caminho_origem):
+        # Sempre parte do arquivo fonte (não da cópia no STATIC_ROOT), para que rodar o
+        # collectstatic de novo gere exatamente os mesmos bytes e, portanto, os mesmos hashes.
+        with origem.open(caminho_origem) as arquivo:
+            bruto = arquivo.read()
+        imagem = Image.open(BytesIO(bruto))
+        imagem.load()
+
+        otimizado = self._codificar(imagem, imagem.format)
+        # Se a recompressão não reduzir o tamanho, publica o arquivo fonte como está.
+        self._gravar(caminho, otimizado if len(otimizado) < len(bruto) else bruto)
+        gerados = {caminho: (self, caminho)}
+
+        if imagem.mode not in ('RGB', 'RGBA'):
+            imagem = imagem.convert('RGBA')  # Garante um modo que o redimensionamento e o WebP aceitam.
+        for largura in LARGURAS_RESPONSIVAS:
+            if imagem.width <= largura:
+                continue  # Não gera variantes maiores que a imagem original.
+            altura = round(imagem.height * largura / imagem.width)
+            variante = imagem.resize((largura, altura), Image.LANCZOS)
+            nome = nome_variante(caminho, largura)
+            self._gravar(nome, self._codificar(variante, 'WEBP'))
+            gerados[nome] = (self, nome)
+        return gerados
+
+    def _codificar(self, imagem, formato):
+        buffer = BytesIO()
+        if formato == 'JPEG':
+            imagem.convert('RGB').save(buffer, 'JPEG', quality=82, optimize=True, progressive=True)
+        elif formato == 'WEBP':
+            imagem.save(buffer, 'WEBP', quality=80, method=6)
+        else:
+            imagem.save(buffer, formato, optimize=True)
+        return buffer.getvalue()
+
+    def _gravar(self, nome, conteudo):
+        if self.exists(nome):
+            self.delete(nome)
+        self.save(nome, ContentFile(conteudo))
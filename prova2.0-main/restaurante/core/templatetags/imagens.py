@@ -0,0 +1,35 @@
+from functools import lru_cache  # Evita checar o disco a cada renderização.
+
+from django import template
+from django.contrib.staticfiles.storage import staticfiles_storage  # Storage configurado em STORAGES['staticfiles'].
+from django.templatetags.static import static  # Gera a URL (com hash em produção) de um arquivo estático.
+from PIL import Image  # Só lê o cabeçalho para descobrir a largura da imagem original.
+
+from core.storage import LARGURAS_RESPONSIVAS, nome_variante
+
+register = template.Library()
+
+
+@lru_cache(maxsize=None)
+def _larguras(caminho):
+    # Só considera as variantes geradas pelo collectstatic (em desenvolvimento elas não existem).
+    variantes = [
+        (largura, nome_variante(caminho, largura))
+        for largura in LARGURAS_RESPONSIVAS
+        if staticfiles_storage.exists(nome_variante(caminho, largura))
+    ]
+    if not variantes:
+        return ()
+    with staticfiles_storage.open(caminho) as arquivo:
+        largura_original = Image.open(arquivo).width
+    # O original entra na lista com a largura real; com descritores "w" o navegador ignora o src.
+    return tuple(
+        [(largura, nome) for largura, nome in variantes if largura < largura_original]
+        + [(largura_original, caminho)]
+    )
+
+
+# Uso: <img src="{% static 'img/planta.png' %}" srcset="{% srcset 'img/planta.png' %}" sizes="...">
+@register.simple_tag
+def srcset(caminho):
+    return ', '.join(f'{static(nome)} {largura}w' for largura, nome in _larguras(caminho))
@@ -1,3 +1,172 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.http import HttpResponse
+from django.db import connections
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from . import auditoria, limites, replicas
+from .forms import ReservaForm
+from .lembretes import Despachante
+from .models import Cliente, LembreteEnviado, Mesa, Reserva
+
+
+# O test runner do Django usa o backend locmem: os e-mails ficam em mail.outbox.
+class DespachanteTests(TestCase):
+    def setUp(self):
+        mesa = Mesa.objects.create(numero=1, capacidade=4)
+        amanha = datetime.date.today() + datetime.timedelta(days=1)
+        for i in range(5):
+            cliente = Cliente.objects.create(nome=f'Cliente {i}', email=f'cliente{i}@exemplo.com', telefone='0')
+            Reserva.objects.create(
+                cliente=cliente, mesa=mesa, data_reserva=amanha,
+                hora_entrada=datetime.time(12 + i), hora_saida=datetime.time(13 + i), num_pessoas=2,
+            )
+        self.despachante = Despachante(tamanho_lote=2, conexoes=2)
+        self.janela = datetime.timedelta(hours=24)
+
+    def test_envia_cada_mensagem_uma_vez(self):
+        self.assertEqual(self.despachante.enviar('confirmacao', self.janela), 5)
+        self.assertEqual(self.despachante.enviar('confirmacao', self.janela), 0)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), [f'cliente{i}@exemplo.com' for i in range(5)])
+        self.assertFalse(LembreteEnviado.objects.filter(enviado_em__isnull=True).exists())
+
+    def test_texto_nao_e_escapado_como_html(self):
+        Cliente.objects.filter(nome='Cliente 0').update(nome="Ana D'Ávila & Filhos")
+        self.despachante.enviar('confirmacao', self.janela)
+        corpo = next(m.body for m in mail.outbox if m.to == ['cliente0@exemplo.com'])
+        self.assertIn("Olá, Ana D'Ávila & Filhos!", corpo)
+
+    def test_falha_no_envio_libera_a_reserva(self):
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError):
+            self.assertEqual(self.despachante.enviar('confirmacao', self.janela), 0)
+        self.assertFalse(LembreteEnviado.objects.exists())
+        self.assertEqual(self.despachante.enviar('confirmacao', self.janela), 5)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_falha_ao_montar_nao_deixa_marca(self):
+        montar = Despachante._montar
+
+        def montar_com_erro(despachante, template, tipo, reserva):
+            if reserva.cliente.nome == 'Cliente 0':
+                raise ValueError('erro de template')
+            return montar(despachante, template, tipo, reserva)
+
+        with mock.patch.object(Despachante, '_montar', montar_com_erro):
+            self.assertEqual(self.despachante.enviar('confirmacao', self.janela), 4)
+        self.assertEqual(LembreteEnviado.objects.count(), 4)
+        self.assertEqual(self.despachante.enviar('confirmacao', self.janela), 1)  # A que falhou continua pendente.
+        self.assertEqual(len(mail.outbox), 5)
+
+
+@limites.limitar('relatorios')
+def _view_limitada(request):
+    return HttpResponse('ok')
+
+
+@limites.limitar_concorrencia('relatorios')
+def _view_concorrente(request):
+    return HttpResponse('ok')
+
+
+class LimitesTests(SimpleTestCase):
+    def setUp(self):
+        # Armazenamento e semáforos novos a cada teste; 'relatorios' usa (0.2 ficha/s, rajada de 3).
+        for nome, valor in (('_armazenamento', None), ('_semaforos', {})):
+            patcher = mock.patch.object(limites, nome, valor)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.agora = 1000.0
+        patcher = mock.patch('core.limites.time.monotonic', side_effect=lambda: self.agora)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def requisicao(self):
+        request = RequestFactory().get('/relatorio/reservas/')
+        request.user = User(pk=1, username='teste')
+        return request
+
+    def test_rajada_acima_do_limite_recebe_429(self):
+        respostas = [_view_limitada(self.requisicao()) for _ in range(4)]
+        self.assertEqual([r.status_code for r in respostas], [200, 200, 200, 429])
+        self.assertEqual(respostas[-1]['Retry-After'], '5')  # 1 ficha a 0,2 ficha/s.
+
+    def test_fichas_sao_repostas_com_o_tempo(self):
+        for _ in range(3):
+            _view_limitada(self.requisicao())
+        self.assertEqual(_view_limitada(self.requisicao()).status_code, 429)
+        self.agora += 5
+        self.assertEqual(_view_limitada(self.requisicao()).status_code, 200)
+        self.assertEqual(_view_limitada(self.requisicao()).status_code, 429)
+
+    def test_concorrencia_acima_do_limite_recebe_429(self):
+        semaforo = limites._obter_semaforo('relatorios')
+        semaforo.acquire()
+        semaforo.acquire()  # Simula dois relatórios já em andamento.
+        resposta = _view_concorrente(self.requisicao())
+        self.assertEqual(resposta.status_code, 429)
+        self.assertIn('Retry-After', resposta)
+        semaforo.release()
+        self.assertEqual(_view_concorrente(self.requisicao()).status_code, 200)
+
+
+# 'replica' espelha o 'default' nos testes: os dados são os mesmos, então o que se verifica é para onde vão as consultas.
+@override_settings(
+    REPLICAS=['replica'],
+    REPLICA_ATRASO_MAXIMO=5,
+    STORAGES={'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}},
+)
+class ReplicasTests(TransactionTestCase):
+    # TransactionTestCase: a conexão da réplica é outra e não enxergaria (nem conseguiria ler) a transação aberta do TestCase.
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        patcher = mock.patch.object(auditoria, 'ATIVO', False)  # Sem a thread de gravação do log durante o teste.
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client.force_login(User.objects.create_user('anfitriao'))
+        self.agora = 1000.0
+        patcher = mock.patch.object(replicas, 'time', mock.Mock(time=lambda: self.agora))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def consultas_de_clientes(self, url):
+        # Retorna quantas consultas à tabela de clientes foram para o primário e para a réplica.
+        with CaptureQueriesContext(connections['default']) as primario, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            self.client.get(url)
+        contar = lambda consultas: sum('core_cliente' in c['sql'] for c in consultas.captured_queries)
+        return contar(primario), contar(replica)
+
+    def test_view_de_leitura_usa_a_replica(self):
+        self.assertEqual(self.consultas_de_clientes('/clientes/'), (0, 1))
+
+    def test_depois_de_escrever_le_do_primario_ate_o_atraso_passar(self):
+        self.client.post('/clientes/criar/', {'nome': 'Ana', 'email': 'ana@exemplo.com', 'telefone': '0'})
+        self.assertEqual(self.consultas_de_clientes('/clientes/'), (1, 0))
+        self.agora += 4
+        self.assertEqual(self.consultas_de_clientes('/clientes/'), (1, 0))
+        self.agora += 2  # Passou o REPLICA_ATRASO_MAXIMO.
+        self.assertEqual(self.consultas_de_clientes('/clientes/'), (0, 1))
+
+    def test_conflito_do_reserva_form_consulta_o_primario(self):
+        cliente = Cliente.objects.create(nome='Ana', email='ana@exemplo.com', telefone='0')
+        mesa = Mesa.objects.create(numero=1, capacidade=4)
+        dados = {
+            'cliente': cliente.pk, 'mesa': mesa.pk,
+            'data_reserva': datetime.date.today() + datetime.timedelta(days=1),
+            'hora_entrada': '19:00', 'hora_saida': '21:00', 'num_pessoas': 2,
+        }
+
+        @replicas.ler_da_replica  # Mesmo dentro de uma view roteada para a réplica.
+        def validar(request):
+            return ReservaForm(dados).is_valid()
+
+        with CaptureQueriesContext(connections['default']) as primario, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            self.assertTrue(validar(None))
+        self.assertTrue(any('core_reserva' in c['sql'] for c in primario.captured_queries))
+        self.assertFalse(any('core_reserva' in c['sql'] for c in replica.captured_queries))
@@ -3,14 +3,19 @@ from .models import Cliente, Mesa, Reserva  # Importa os modelos Cliente, Mesa e
 from .forms import ClienteForm, ReservaForm, MesaForm  # Importa os formulários personalizados para Cliente, Reserva e Mesa.
 from django.shortcuts import render, redirect, get_object_or_404  # Funções utilitárias para renderizar templates e redirecionar.
 from django.contrib.auth.models import User  # Importa o modelo de usuário padrão do Django.
-from django.http import HttpResponse  # Para retornar respostas HTTP.
+from django.http import HttpResponse, HttpResponseBadRequest  # Para retornar respostas HTTP.
 from django.template.loader import render_to_string  # Carrega um template HTML como string.
 from weasyprint import HTML  # Para gerar arquivos PDF a partir de HTML.
 from .forms import EditUserForm, CustomUserCreationForm  # Importa formulários personalizados para criação e edição de usuários.
 from django.contrib.auth.decorators import login_required  # Decorador que restringe acesso a usuários autenticados.
-from django.db.models import Value  # Importa a classe Value para usar em anotações.
+from django.db.models import F, Value  # Importa as classes F e Value para usar em anotações.
 from django.db.models.functions import Concat  # Importa a função Concat para concatenar strings em queries.
 from django.views.generic import ListView  # Importa a classe ListView para criar views baseadas em listas.
+from django.utils.dateparse import parse_date  # Converte 'AAAA-MM-DD' da URL em data.
+from . import auditoria  # Registro (em lote) de quem criou, editou ou deletou cada objeto.
+from .limites import limitar, limitar_concorrencia  # Limites de requisições (429) para endpoints caros.
+from .arquivo import reservas_com_historico  # Junta as reservas ativas com as arquivadas.
+from .replicas import ler_da_replica  # Manda as leituras de listas e relatórios para as réplicas.
 
 
 # menu
@@ -22,6 +27,7 @@ def menu(request):
 # cliente
 
 @login_required
+@ler_da_replica
 def lista_clientes(request):
     clientes = Cliente.objects.all()  # Busca todos os clientes no banco de dados.
     return render(request, 'core/clientes/lista_clientes.html', {'clientes': clientes})  # Renderiza a lista de clientes.
@@ -31,7 +37,8 @@ def criar_cliente(request):
     if request.method == 'POST':  # Verifica se o formulário foi enviado (POST).
         form = ClienteForm(request.POST)  # Instancia o formulário com os dados enviados.
         if form.is_valid():  # Verifica se os dados são válidos.
-            form.save()  # Salva o cliente no banco de dados.
+            cliente = form.save()  # Salva o cliente no banco de dados.
+            auditoria.registrar('criar', cliente, request.user)  # Registra a criação no log de auditoria.
             return redirect('lista_clientes')  # Redireciona para a lista de clientes.
     else:
         form = ClienteForm()  # Exibe um formulário vazio se for uma requisição GET.
@@ -41,9 +48,11 @@ def criar_cliente(request):
 def editar_cliente(request, cliente_id):
     cliente = get_object_or_404(Cliente, id=cliente_id)  # Obtém o cliente ou retorna erro 404 se não existir.
     if request.method == 'POST':
+        antes = auditoria.capturar(cliente)  # Guarda os valores antes da edição (o formulário altera a instância).
         form = ClienteForm(request.POST, instance=cliente)  # Preenche o formulário com os dados existentes do cliente.
         if form.is_valid():
             form.save()  # Salva as alterações.
+            auditoria.registrar('editar', cliente, request.user, antes)  # Registra o que mudou.
             return redirect('lista_clientes')  # Redireciona para a lista de clientes.
     else:
         form = ClienteForm(instance=cliente)  # Preenche o formulário com os dados do cliente.
@@ -53,12 +62,13 @@ def editar_cliente(request, cliente_id):
 def deletar_cliente(request, cliente_id):
     cliente = get_object_or_404(Cliente, id=cliente_id)  # Busca o cliente ou retorna erro 404.
     if request.method == 'POST':
-        cliente.delete()  # Deleta o cliente do banco de dados.
+        auditoria.deletar(cliente, request.user)  # Deleta o cliente e registra no log (inclusive as reservas apagadas junto).
         return redirect('lista_clientes')  # Redireciona para a lista de clientes.
     return render(request, 'core/clientes/deletar_cliente.html', {'cliente': cliente})  # Renderiza a página de confirmação de deleção.
 
 # reservas
 @login_required
+@ler_da_replica
 def lista_reservas(request):
     reservas = Reserva.objects.all().order_by('data_reserva', 'hora_entrada')  # Busca todas as reservas e ordena por data e hora de entrada.
     query = request.GET.get('q')  # Obtém o termo de busca (se houver).
@@ -71,24 +81,29 @@ def lista_reservas(request):
     return render(request, 'core/reservas/lista_reservas.html', {'reservas': reservas})  # Renderiza a lista de reservas.
 
 @login_required
+@limitar('reservas')  # Evita que scripts fiquem criando reservas sem parar.
 def criar_reserva(request):
     if request.method == 'POST':
         form = ReservaForm(request.POST)  # Instancia o formulário com os dados enviados.
         if form.is_valid():
-            form.save()  # Salva a nova reserva.
+            reserva = form.save()  # Salva a nova reserva.
+            auditoria.registrar('criar', reserva, request.user)  # Registra a criação no log de auditoria.
             return redirect('lista_reservas')  # Redireciona para a lista de reservas.
     else:
         form = ReservaForm()  # Exibe o formulário vazio para criação.
     return render(request, 'core/reservas/criar_reserva.html', {'form': form})  # Renderiza o formulário de criação de reserva.
 
 @login_required
+@limitar('reservas')
 def editar_reserva(request, reserva_id):
     reserva = get_object_or_404(Reserva, id=reserva_id)  # Obtém a reserva pelo ID ou retorna erro 404.
     mesas = Mesa.objects.all()  # Busca todas as mesas.
     if request.method == 'POST':
+        antes = auditoria.capturar(reserva)  # Guarda os valores antes da edição.
         form = ReservaForm(request.POST, instance=reserva)  # Preenche o formulário com os dados existentes da reserva.
         if form.is_valid():
             form.save()  # Salva as alterações na reserva.
+            auditoria.registrar('editar', reserva, request.user, antes)  # Registra o que mudou.
             return redirect('lista_reservas')  # Redireciona para a lista de reservas.
     else:
         form = ReservaForm(instance=reserva)  # Preenche o formulário com os dados da reserva.
@@ -98,12 +113,13 @@ def editar_reserva(request, reserva_id):
 def deletar_reserva(request, pk):
     reserva = get_object_or_404(Reserva, pk=pk)  # Busca a reserva ou retorna erro 404.
     if request.method == 'POST':
-        reserva.delete()  # Deleta a reserva.
+        auditoria.deletar(reserva, request.user)  # Deleta a reserva e registra no log.
         return redirect('lista_reservas')  # Redireciona para a lista de reservas.
     return render(request, 'core/reservas/deletar_reserva.html', {'reserva': reserva})  # Renderiza a página de confirmação de deleção.
 
 # Tudo sobre usuário
 @login_required
+@ler_da_replica
 def listar_usuarios(request):
     usuarios = User.objects.all()  # Busca todos os usuários.
     return render(request, 'core/usuarios/listar_usuarios.html', {'usuarios': usuarios})  # Renderiza a lista de usuários.
@@ -114,7 +130,8 @@ def criar_usuario(request):
     if request.method == 'POST':
         form = CustomUserCreationForm(request.POST)  # Preenche o formulário de criação de usuário.
         if form.is_valid():
-            form.save()  # Salva o novo usuário.
+            usuario = form.save()  # Salva o novo usuário.
+            auditoria.registrar('criar', usuario, request.user)  # Registra a criação no log de auditoria.
             return redirect('listar_usuarios')  # Redireciona para a lista de usuários.
     else:
         form = CustomUserCreationForm()  # Exibe o formulário vazio.
@@ -124,9 +141,11 @@ def criar_usuario(request):
 def editar_usuario(request, user_id):
     user = get_object_or_404(User, id=user_id)  # Busca o usuário pelo ID ou retorna erro 404.
     if request.method == 'POST':
+        antes = auditoria.capturar(user)  # Guarda os valores antes da edição (a senha não entra no log).
         form = EditUserForm(request.POST, instance=user)  # Preenche o formulário de edição do usuário.
         if form.is_valid():
             form.save()  # Salva as alterações no usuário.
+            auditoria.registrar('editar', user, request.user, antes)  # Registra o que mudou.
             return redirect('perfil_usuario')  # Redireciona para o perfil do usuário.
     else:
         form = EditUserForm(instance=user)  # Preenche o formulário com os dados do usuário.
@@ -137,13 +156,14 @@ def editar_usuario(request, user_id):
 def deletar_usuario(request, user_id):
     usuario = get_object_or_404(User, id=user_id)  # Busca o usuário ou retorna erro 404.
     if request.method == 'POST':
-        usuario.delete()  # Deleta o usuário.
+        auditoria.deletar(usuario, request.user)  # Deleta o usuário e registra no log.
         return redirect('listar_usuarios')  # Redireciona para a lista de usuários.
     return render(request, 'core/usuarios/deletar_usuario.html', {'usuario': usuario})  # Renderiza a página de confirmação de deleção.
 
 
 # View para listar mesas
 @login_required
+@ler_da_replica
 def listar_mesas(request):
     mesas = Mesa.objects.all()  # Busca todas as mesas.
     return render(request, 'core/mesas/listar_mesas.html', {'mesas': mesas})  # Renderiza a lista de mesas.
@@ -154,7 +174,8 @@ def criar_mesa(request):
     if request.method == 'POST':
         form = MesaForm(request.POST)  # Preenche o formulário de criação de mesa.
         if form.is_valid():
-            form.save()  # Salva a nova mesa.
+            mesa = form.save()  # Salva a nova mesa.
+            auditoria.registrar('criar', mesa, request.user)  # Registra a criação no log de auditoria.
             return redirect('listar_mesas')  # Redireciona para a lista de mesas.
     else:
         form = MesaForm()  # Exibe o formulário vazio.
@@ -165,9 +186,11 @@ def criar_mesa(request):
 def atualizar_mesa(request, pk):
     mesa = get_object_or_404(Mesa, pk=pk)
     if request.method == 'POST':
+        antes = auditoria.capturar(mesa)
         form = MesaForm(request.POST, instance=mesa)
         if form.is_valid():
             form.save()
+            auditoria.registrar('editar', mesa, request.user, antes)
             return redirect('listar_mesas')
     else:
         form = MesaForm(instance=mesa)
@@ -178,7 +201,7 @@ def atualizar_mesa(request, pk):
 def deletar_mesa(request, pk):
     mesa = get_object_or_404(Mesa, pk=pk)
     if request.method == 'POST':
-        mesa.delete()
+        auditoria.deletar(mesa, request.user)  # Também registra as reservas da mesa apagadas em cascata.
         return redirect('listar_mesas')
     return render(request, 'core/mesas/deletar_mesa.html', {'mesa': mesa})
 
@@ -194,8 +217,27 @@ def gerar_pdf(html_string, nome_arquivo):
 
 # Gerar PDF de Reservas
 @login_required
+@limitar('relatorios')
+@limitar_concorrencia('relatorios')  # Gerar PDF é caro: poucos ao mesmo tempo por processo.
+@ler_da_replica
 def gerar_relatorio_reservas(request):
-    reservas = Reserva.objects.all()
+    if request.GET.get('historico'):  # Com ?historico=1 o relatório inclui as reservas arquivadas.
+        # Período em ?inicio=AAAA-MM-DD&fim=AAAA-MM-DD; sem início, pega o último ano para não ler o arquivo inteiro.
+        datas = {}
+        for campo in ('inicio', 'fim'):
+            valor = request.GET.get(campo)
+            try:
+                datas[campo] = parse_date(valor) if valor else None
+            except ValueError:  # Formato certo, mas data inexistente (ex.: 2024-02-30).
+                datas[campo] = None
+            if valor and datas[campo] is None:  # parse_date devolve None para formato errado (ex.: 'abc').
+                return HttpResponseBadRequest('Data inválida.')
+        inicio, fim = datas['inicio'], datas['fim']
+        if inicio is None:
+            inicio = datetime.date.today() - datetime.timedelta(days=365)
+        reservas = reservas_com_historico(inicio, fim)
+    else:
+        reservas = Reserva.objects.annotate(cliente_nome=F('cliente__nome'))  # Mesmos campos usados no histórico.
      # Captura a data atual no formato DD/MM/AAAA
     data_atual = datetime.date.today().strftime('%d/%m/%Y')  # Exemplo: 19/10/2024
     hora_atual = datetime.datetime.now().strftime('%H:%M')   # Exemplo: 14:35
@@ -209,6 +251,9 @@ def gerar_relatorio_reservas(request):
 
 # Gerar PDF de Clientes
 @login_required
+@limitar('relatorios')
+@limitar_concorrencia('relatorios')  # Gerar PDF é caro: poucos ao mesmo tempo por processo.
+@ler_da_replica
 def gerar_relatorio_clientes(request):
     clientes = Cliente.objects.all()
      # Captura a data atual no formato DD/MM/AAAA
@@ -224,6 +269,9 @@ def gerar_relatorio_clientes(request):
 
 # Gerar PDF de Usuários
 @login_required
+@limitar('relatorios')
+@limitar_concorrencia('relatorios')  # Gerar PDF é caro: poucos ao mesmo tempo por processo.
+@ler_da_replica
 def gerar_relatorio_usuarios(request):
     usuarios = User.objects.all()
      # Captura a data atual no formato DD/MM/AAAA
@@ -239,6 +287,9 @@ def gerar_relatorio_usuarios(request):
 
 # Gerar PDF de Mesas
 @login_required
+@limitar('relatorios')
+@limitar_concorrencia('relatorios')  # Gerar PDF é caro: poucos ao mesmo tempo por processo.
+@ler_da_replica
 def gerar_relatorio_mesas(request):
     mesas = Mesa.objects.all()
      # Captura a data atual no formato DD/MM/AAAA
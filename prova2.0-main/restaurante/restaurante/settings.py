@@ -42,10 +42,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve os estáticos (com hash e pré-comprimidos) direto do WSGI/ASGI.
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.replicas.ReplicaMiddleware',  # Mantém as leituras no primário logo após uma escrita do usuário.
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -78,9 +80,25 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Réplica de leitura. Só é usada se estiver em REPLICAS; localmente pode ser uma cópia do db.sqlite3.
+    # Nos testes ela espelha o 'default'.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
+# Leituras de listas e relatórios vão para as réplicas; escritas ficam no 'default'
+DATABASE_ROUTERS = ['core.replicas.RoteadorReplicas']
+
+# Aliases de DATABASES usados como réplica (vazio = tudo no 'default'). Ex.: ['replica']
+REPLICAS = []
+
+# Segundos em que um usuário lê do primário depois de gravar algo (atraso máximo esperado da réplica)
+REPLICA_ATRASO_MAXIMO = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -106,7 +124,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 LANGUAGE_CODE = 'pt-br'
 
-TIME_ZONE = 'America\Sao_Paulo'
+TIME_ZONE = 'America/Sao_Paulo'
 
 USE_I18N = True
 
@@ -118,12 +136,44 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Pasta onde o collectstatic junta os arquivos para produção
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Nomes com hash do conteúdo, imagens recomprimidas e cópias .gz/.br geradas no collectstatic
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'core.storage.PipelineStaticFilesStorage',
+    },
+}
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Limites de requisições: os valores padrão ficam em core/limites.py (LIMITES_PADRAO e
+# CONCORRENCIA_PADRAO). Para mudar só alguma classe, descomente e ajuste:
+# LIMITES_TAXA = {
+#     'reservas': (1, 10),  # (fichas repostas por segundo, tamanho máximo da rajada)
+# }
+# LIMITES_CONCORRENCIA = {
+#     'relatorios': 2,  # Relatórios em PDF gerados ao mesmo tempo em cada processo
+# }
+
+# Alias de CACHES para compartilhar os limites entre processos (None = memória local do processo)
+LIMITES_CACHE = None
+
+
+# E-mails de confirmação e lembrete (comando enviar_lembretes)
+# Por padrão aponta para um SMTP local de testes: python -m aiosmtpd -n -l localhost:1025
+EMAIL_HOST = 'localhost'
+EMAIL_PORT = 1025
+DEFAULT_FROM_EMAIL = 'Restaurante Maydes <reservas@restaurantemaydes.com.br>'
+
+
 LOGIN_REDIRECT_URL = 'menu'
 
 LOGOUT_REDIRECT_URL = 'login'